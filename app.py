@@ -1,9 +1,10 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, Response, stream_with_context
 from functools import wraps
 import json
 import os
 from database import Database
 from ml_model import PowerPlantPredictor
+from live_updates import LiveUpdateHub
 
 app = Flask(__name__)
 app.secret_key = 'power-plant-secret-key-2025'  # Ganti dengan secret key yang aman
@@ -11,6 +12,7 @@ app.secret_key = 'power-plant-secret-key-2025'  # Ganti dengan secret key yang a
 # Initialize database and model
 db = Database()
 predictor = PowerPlantPredictor()
+live_hub = LiveUpdateHub()
 
 # Login required decorator
 def login_required(f):
@@ -22,6 +24,34 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def publish_prediction_update(user_id, prediction_id):
+    """Push delta prediksi baru ke semua viewer dashboard/charts milik user"""
+    # Tidak ada viewer -> tidak perlu query tambahan
+    if not live_hub.has_subscribers(user_id):
+        return 0
+    
+    try:
+        # Query dilakukan sekali per prediksi, bukan sekali per viewer
+        prediction = db.get_prediction_by_id(prediction_id)
+        if prediction is None:
+            return 0
+        stats = db.get_prediction_stats(user_id)
+        return live_hub.publish(user_id, 'prediction', {
+            'prediction': prediction,
+            'stats': stats,
+            'chart_point': {
+                'date': prediction['prediction_date'][:16],
+                'power': prediction['predicted_power'],
+                'temperature': prediction['temperature'],
+                'pressure': prediction['ambient_pressure'],
+                'humidity': prediction['relative_humidity'],
+                'vacuum': prediction['exhaust_vacuum']
+            }
+        })
+    except Exception as e:
+        print(f"Error publishing live update: {e}")
+        return 0
+
 @app.route("/")
 def landing_page():
     """Halaman utama - landing page"""
@@ -140,6 +170,7 @@ def predict():
                 exhaust_vacuum,
                 result['predicted_power']
             )
+            publish_prediction_update(session['user_id'], prediction_id)
             
             # Get model info untuk ditampilkan bersama hasil
             try:
@@ -281,6 +312,29 @@ def api_model_info():
     """API endpoint untuk info model"""
     return jsonify(predictor.get_model_info())
 
+@app.route("/api/drift")
+@login_required
+def api_drift():
+    """API endpoint untuk laporan drift input"""
+    return jsonify(predictor.get_drift_report())
+
+@app.route("/api/drift/reset", methods=['POST'])
+@login_required
+def api_drift_reset():
+    """API endpoint untuk reset window statistik drift"""
+    window_start = predictor.reset_drift_monitor()
+    return jsonify({'success': True, 'window_start': window_start})
+
+@app.route("/api/stream")
+@login_required
+def api_stream():
+    """SSE endpoint untuk update live dashboard dan charts"""
+    response = Response(stream_with_context(live_hub.stream(session['user_id'])),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route("/api/predict", methods=['POST'])
 @login_required
 def api_predict():
@@ -297,7 +351,7 @@ def api_predict():
         
         # Simpan ke database jika diminta
         if data.get('save_to_db', False):
-            db.save_prediction(
+            prediction_id = db.save_prediction(
                 session['user_id'],
                 data['temperature'],
                 data['ambient_pressure'],
@@ -305,6 +359,7 @@ def api_predict():
                 data['exhaust_vacuum'],
                 result['predicted_power']
             )
+            publish_prediction_update(session['user_id'], prediction_id)
         
         return jsonify({'success': True, 'result': result})
         
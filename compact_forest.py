@@ -0,0 +1,397 @@
+"""Compaction Random Forest: subset tree, batas kedalaman, dan array float32.
+
+Model hasil compaction disimpan sebagai ``.npz`` (array node datar, tanpa
+pickle) beserta metadata ``<model>.meta.json`` sehingga dapat dimuat
+langsung oleh PowerPlantPredictor.
+
+Pemilihan tree dan laporan akurasi hanya memakai baris holdout dari
+training (dikenali lewat ``holdout`` di metadata model sumber), jadi berikan
+dataset yang sama dengan yang dipakai ``train_model.py``.
+
+Contoh:
+    python compact_forest.py --csv CCPP.csv --n-trees 30 --max-depth 14
+    python compact_forest.py --from-db powerplant.db --output random_forest_compact.npz
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ml_model import ARTIFACT_FORMAT_VERSION, PowerPlantPredictor, file_sha256, metadata_path_for
+try:
+    import joblib
+except ImportError:
+    joblib = None
+
+# Versi layout array di dalam file .npz
+COMPACT_FORMAT_VERSION = 1
+
+
+class CompactForest:
+    """Random Forest regressor dalam bentuk array node datar (float32 threshold & value).
+
+    Semua tree digabung dalam satu set array. Leaf menunjuk ke dirinya sendiri
+    sehingga prediksi cukup menjalankan ``depth`` langkah vektorisasi untuk
+    semua baris dan semua tree sekaligus.
+    """
+
+    def __init__(self, roots, feature, threshold, left, right, value, depth,
+                 n_features, feature_importances=None):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.depth = int(depth)
+        self.n_features_in_ = int(n_features)
+        if feature_importances is not None:
+            self.feature_importances_ = feature_importances
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def node_count(self):
+        return len(self.value)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.roots, self.feature, self.threshold,
+                                      self.left, self.right, self.value))
+
+    @classmethod
+    def from_sklearn(cls, model, tree_indices=None, max_depth=None):
+        """Konversi RandomForestRegressor; opsional pilih subset tree dan potong kedalaman.
+
+        ``feature_importances_`` adalah rata-rata importance tree yang dipilih.
+        Dengan ``max_depth`` nilainya hanya aproksimasi, karena split di bawah
+        batas kedalaman ikut dihitung walaupun sudah dipotong.
+        """
+        if tree_indices is None:
+            tree_indices = range(len(model.estimators_))
+        tree_indices = list(tree_indices)
+
+        roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+        offset = 0
+        forest_depth = 0
+        for t in tree_indices:
+            tree = model.estimators_[t].tree_
+            t_left, t_right = tree.children_left, tree.children_right
+            t_feature, t_threshold = tree.feature, tree.threshold
+            t_value = tree.value[:, 0, 0]
+
+            # BFS dari root; node pada max_depth dijadikan leaf dengan nilai rata-rata node tersebut
+            order = []
+            new_id = {0: 0}
+            queue = deque([(0, 0)])
+            while queue:
+                node, depth = queue.popleft()
+                is_leaf = t_left[node] == -1 or (max_depth is not None and depth >= max_depth)
+                order.append((node, depth, is_leaf))
+                if not is_leaf:
+                    for child in (t_left[node], t_right[node]):
+                        new_id[child] = len(new_id)
+                        queue.append((child, depth + 1))
+
+            n = len(order)
+            feature = np.zeros(n, dtype=np.int16)
+            threshold = np.zeros(n, dtype=np.float32)
+            left = np.empty(n, dtype=np.int32)
+            right = np.empty(n, dtype=np.int32)
+            value = np.empty(n, dtype=np.float32)
+            for node, depth, is_leaf in order:
+                i = new_id[node]
+                value[i] = t_value[node]
+                if not is_leaf:
+                    feature[i] = t_feature[node]
+                    threshold[i] = t_threshold[node]
+                    left[i] = new_id[t_left[node]] + offset
+                    right[i] = new_id[t_right[node]] + offset
+                else:
+                    left[i] = right[i] = i + offset
+                forest_depth = max(forest_depth, depth)
+
+            roots.append(offset)
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            offset += n
+
+        return cls(
+            roots=np.array(roots, dtype=np.int32),
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            depth=forest_depth,
+            n_features=model.n_features_in_,
+            feature_importances=np.mean(
+                [model.estimators_[t].feature_importances_ for t in tree_indices], axis=0),
+        )
+
+    def predict(self, X, chunk_size=4096):
+        """Prediksi rata-rata semua tree (input dibandingkan sebagai float32 seperti scikit-learn)"""
+        with np.errstate(over='ignore'):
+            # Nilai di luar range float32 (mis. 1e40) menjadi inf dan ditolak di bawah
+            X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Input harus berbentuk (n, {self.n_features_in_})")
+        if not np.isfinite(X).all():
+            # NaN/inf akan selalu mengikuti cabang kanan dan menghasilkan prediksi palsu
+            raise ValueError("Input mengandung NaN, inf, atau nilai di luar range float32")
+
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            batch = X[start:start + chunk_size]
+            rows = np.arange(len(batch))[:, None]
+            idx = np.broadcast_to(self.roots, (len(batch), len(self.roots)))
+            for _ in range(self.depth):
+                go_left = batch[rows, self.feature[idx]] <= self.threshold[idx]
+                idx = np.where(go_left, self.left[idx], self.right[idx])
+            out[start:start + chunk_size] = self.value[idx].mean(axis=1, dtype=np.float64)
+        return out
+
+    def save(self, path):
+        """Simpan ke .npz tanpa kompresi (load cepat, tanpa pickle).
+
+        File ditulis langsung ke ``path``; caller bertanggung jawab atas
+        penggantian atomik bersama metadata (lihat ``publish_artifact``).
+        """
+        arrays = {
+            'format_version': np.array(COMPACT_FORMAT_VERSION),
+            'roots': self.roots,
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'left': self.left,
+            'right': self.right,
+            'value': self.value,
+            'depth': np.array(self.depth),
+            'n_features': np.array(self.n_features_in_),
+        }
+        if hasattr(self, 'feature_importances_'):
+            arrays['feature_importances'] = np.asarray(self.feature_importances_, dtype=np.float64)
+        # np.savez menambah .npz jika belum ada, jadi tulis lewat file handle
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version > COMPACT_FORMAT_VERSION:
+                raise ValueError(f"Format compact forest v{version} tidak didukung")
+            return cls(
+                roots=data['roots'],
+                feature=data['feature'],
+                threshold=data['threshold'],
+                left=data['left'],
+                right=data['right'],
+                value=data['value'],
+                depth=data['depth'],
+                n_features=data['n_features'],
+                feature_importances=data['feature_importances'] if 'feature_importances' in data.files else None,
+            )
+
+
+def select_trees(model, X, y, n_trees):
+    """Pilih subset tree secara greedy (forward selection) yang meminimalkan RMSE"""
+    X = np.asarray(X, dtype=np.float32)
+    per_tree = np.stack([est.predict(X) for est in model.estimators_])
+    selected = []
+    running_sum = np.zeros(len(y))
+    remaining = list(range(len(per_tree)))
+    for k in range(1, n_trees + 1):
+        candidates = (running_sum + per_tree[remaining]) / k
+        errors = np.sqrt(((candidates - y) ** 2).mean(axis=1))
+        best = remaining.pop(int(np.argmin(errors)))
+        selected.append(best)
+        running_sum += per_tree[best]
+    return selected
+
+
+def _errors(y_true, y_pred):
+    return {
+        'rmse': round(float(np.sqrt(np.mean((y_true - y_pred) ** 2))), 4),
+        'mae': round(float(np.mean(np.abs(y_true - y_pred))), 4),
+    }
+
+
+def _latency(model, X, repeats=200):
+    """Median latency prediksi satu baris dan waktu per baris untuk batch (ms)"""
+    single = X[:1].astype(np.float64)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(single)
+        timings.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.predict(X)
+    batch = time.perf_counter() - start
+    return round(float(np.median(timings)) * 1000, 4), round(batch / len(X) * 1000, 5)
+
+
+def _sklearn_nbytes(model):
+    total = 0
+    for est in model.estimators_:
+        state = est.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compaction model Random Forest')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help='Dataset evaluasi (CSV dengan kolom AT, AP, RH, V, PE)')
+    source.add_argument('--from-db', help='Path database SQLite, evaluasi dengan tabel predictions')
+    parser.add_argument('--model', default='random_forest_model.pkl')
+    parser.add_argument('--output', default='random_forest_compact.npz')
+    parser.add_argument('--n-trees', type=int, default=None, help='Jumlah tree yang dipertahankan')
+    parser.add_argument('--max-depth', type=int, default=None, help='Batas kedalaman tree')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--random-state', type=int, default=42)
+    args = parser.parse_args()
+    if args.n_trees is not None and args.n_trees < 1:
+        parser.error('--n-trees harus minimal 1')
+    if args.max_depth is not None and args.max_depth < 0:
+        parser.error('--max-depth tidak boleh negatif')
+
+    # Diimpor di sini agar memuat CompactForest tidak ikut memuat modul training
+    from train_model import (FEATURE_NAMES, dataset_sha256, holdout_split, load_dataset,
+                             publish_artifact, read_csv_chunks, read_db_chunks)
+
+    source_predictor = PowerPlantPredictor(os.path.abspath(args.model))
+    if not source_predictor.is_loaded or not hasattr(source_predictor.model, 'estimators_'):
+        print(f"❌ Model Random Forest tidak dapat dimuat: {args.model}")
+        return 1
+    original = source_predictor.model
+    source_meta = source_predictor.metadata or {}
+
+    if args.csv:
+        X, y = load_dataset(read_csv_chunks(args.csv, args.chunk_size))
+    else:
+        X, y = load_dataset(read_db_chunks(args.from_db, args.chunk_size))
+
+    # Hanya baris holdout training yang tidak pernah dilihat tree
+    holdout = source_meta.get('holdout')
+    if holdout and holdout.get('data_sha256') == dataset_sha256(X, y) and holdout.get('n_test', 0) >= 2:
+        test_idx, _ = holdout_split(len(X), holdout['test_size'], holdout['random_state'])
+        X, y = X[test_idx], y[test_idx]
+        eval_data = 'training_holdout'
+        print(f"✅ Memakai {len(X)} baris holdout dari data training")
+    else:
+        eval_data = 'external_unverified'
+        print("⚠️ Data tidak cocok dengan holdout di metadata model sumber.")
+        print("   Laporan hanya valid jika data ini TIDAK dipakai saat training; "
+              "berikan dataset training yang sama agar holdout dipakai otomatis.")
+
+    # Setengah data untuk memilih tree, setengah lagi untuk laporan akurasi
+    indices = np.random.default_rng(args.random_state).permutation(len(X))
+    half = len(X) // 2
+    X_select, y_select = X[indices[:half]], y[indices[:half]]
+    X_eval, y_eval = X[indices[half:]], y[indices[half:]]
+
+    tree_indices = None
+    if args.n_trees is not None and args.n_trees < len(original.estimators_):
+        print(f"🌲 Memilih {args.n_trees} dari {len(original.estimators_)} tree...")
+        tree_indices = select_trees(original, X_select, y_select, args.n_trees)
+
+    compact = CompactForest.from_sklearn(original, tree_indices, args.max_depth)
+    output = os.path.abspath(args.output)
+    output_tmp = output + '.tmp'
+    compact.save(output_tmp)
+
+    start = time.perf_counter()
+    CompactForest.load(output_tmp)
+    compact_load = time.perf_counter() - start
+    start = time.perf_counter()
+    if joblib is not None:
+        joblib.load(source_predictor.model_path)
+    else:
+        with open(source_predictor.model_path, 'rb') as f:
+            pickle.load(f)
+    original_load = time.perf_counter() - start
+
+    original_single, original_batch = _latency(original, X_eval)
+    compact_single, compact_batch = _latency(compact, X_eval)
+
+    report = {
+        'eval_data': eval_data,
+        'selection_samples': int(len(X_select)),
+        'eval_samples': int(len(X_eval)),
+        'original': {
+            'n_trees': len(original.estimators_),
+            'nodes': int(sum(e.tree_.node_count for e in original.estimators_)),
+            **_errors(y_eval, original.predict(X_eval)),
+            'latency_single_ms': original_single,
+            'latency_batch_ms_per_row': original_batch,
+            'memory_mb': round(_sklearn_nbytes(original) / 1024 / 1024, 3),
+            'file_size_mb': round(os.path.getsize(source_predictor.model_path) / 1024 / 1024, 3),
+            'load_time_s': round(original_load, 4),
+        },
+        'compact': {
+            'n_trees': compact.n_estimators,
+            'nodes': compact.node_count,
+            **_errors(y_eval, compact.predict(X_eval)),
+            'latency_single_ms': compact_single,
+            'latency_batch_ms_per_row': compact_batch,
+            'memory_mb': round(compact.nbytes / 1024 / 1024, 3),
+            'file_size_mb': round(os.path.getsize(output_tmp) / 1024 / 1024, 3),
+            'load_time_s': round(compact_load, 4),
+        },
+    }
+
+    previous_version = 0
+    if os.path.exists(metadata_path_for(output)):
+        with open(metadata_path_for(output), 'r') as f:
+            previous_version = json.load(f).get('model_version') or 0
+
+    metadata = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_version': previous_version + 1,
+        'compacted_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sha256': file_sha256(output_tmp),
+        'file_size': os.path.getsize(output_tmp),
+        'feature_names': FEATURE_NAMES,
+        'target': 'PE',
+        'model_type': 'CompactForest',
+        'compaction': {
+            'source_model': os.path.basename(source_predictor.model_path),
+            'source_sha256': file_sha256(source_predictor.model_path),
+            'source_model_version': source_meta.get('model_version'),
+            'source_trained_at': source_meta.get('trained_at'),
+            'tree_indices': tree_indices,
+            'max_depth': args.max_depth,
+            'report': report,
+        },
+        'metrics': {**{k: report['compact'][k] for k in ('rmse', 'mae')}, 'scope': eval_data},
+        'reference_profile': source_meta.get('reference_profile'),
+    }
+    publish_artifact(output_tmp, metadata, output)
+
+    print("\n" + "=" * 72)
+    print(f"{'':<26}{'Original':>22}{'Compact':>22}")
+    rows = [
+        ('Trees', 'n_trees'), ('Nodes', 'nodes'), ('RMSE', 'rmse'), ('MAE', 'mae'),
+        ('Latency 1 row (ms)', 'latency_single_ms'), ('Batch (ms/row)', 'latency_batch_ms_per_row'),
+        ('Memory (MB)', 'memory_mb'), ('File size (MB)', 'file_size_mb'), ('Load time (s)', 'load_time_s'),
+    ]
+    for label, key in rows:
+        print(f"{label:<26}{report['original'][key]:>22}{report['compact'][key]:>22}")
+    print("=" * 72)
+    print(f"📐 Evaluasi: {len(X_eval)} baris ({eval_data}), pemilihan tree: {len(X_select)} baris")
+    print(f"💾 {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -120,6 +120,33 @@ class Database:
         conn.close()
         return prediction_id
     
+    def get_prediction_by_id(self, prediction_id):
+        """Mendapatkan satu prediksi berdasarkan ID"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, temperature, ambient_pressure, relative_humidity, 
+                   exhaust_vacuum, predicted_power, prediction_date
+            FROM predictions 
+            WHERE id = ?
+        ''', (prediction_id,))
+        
+        p = cursor.fetchone()
+        conn.close()
+        
+        if p is None:
+            return None
+        return {
+            'id': p[0],
+            'temperature': p[1],
+            'ambient_pressure': p[2],
+            'relative_humidity': p[3],
+            'exhaust_vacuum': p[4],
+            'predicted_power': p[5],
+            'prediction_date': p[6]
+        }
+    
     def get_user_predictions(self, user_id, limit=None):
         """Mendapatkan riwayat prediksi user"""
         conn = self.get_connection()
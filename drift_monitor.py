@@ -0,0 +1,454 @@
+import math
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Ringkasan statistik dataset CCPP (9568 baris) yang dipakai melatih Random Forest.
+# Dipakai sebagai reference profile default jika data training tidak tersedia.
+CCPP_REFERENCE_STATS = {
+    'Temperature': {'mean': 19.65, 'std': 7.45, 'min': 1.81, 'max': 37.11},
+    'Ambient Pressure': {'mean': 1013.26, 'std': 5.94, 'min': 992.89, 'max': 1033.30},
+    'Relative Humidity': {'mean': 73.31, 'std': 14.60, 'min': 25.56, 'max': 100.16},
+    'Exhaust Vacuum': {'mean': 54.31, 'std': 12.71, 'min': 25.36, 'max': 81.56},
+}
+
+# Half-life (dalam jumlah input) histogram decayed untuk skor PSI/KS
+DEFAULT_HALF_LIFE = 500
+
+# Threshold PSI yang umum dipakai
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Pseudo-count per bin untuk menghaluskan histogram live sebelum PSI
+PSEUDO_COUNT = 1.0
+# Minimal sampel per bin (termasuk bin overflow) sebelum status drift dinilai
+MIN_SAMPLES_PER_BIN = 20
+
+
+def _normal_cdf(x, mean, std):
+    return 0.5 * (1.0 + math.erf((x - mean) / (std * math.sqrt(2.0))))
+
+
+def build_reference_profile(feature_names, data=None, n_bins=10, stats=None):
+    """Membuat reference profile (mean/std/range + proporsi histogram) per fitur.
+
+    Jika ``data`` (array 2D dengan urutan ``feature_names``) diberikan,
+    statistik dan proporsi bin dihitung langsung dari data dengan numpy.
+    Jika tidak, proporsi didekati dengan distribusi normal dari ``stats``
+    (default: CCPP_REFERENCE_STATS). Bin pertama dan terakhir adalah
+    overflow (< min dan > max).
+    """
+    if data is not None:
+        data = np.asarray(data)
+
+    profile = {}
+    for i, feature in enumerate(feature_names):
+        n = None
+        if data is not None:
+            column = data[:, i]
+            n = len(column)
+            mean = float(column.mean(dtype=np.float64))
+            std = float(column.std(dtype=np.float64, ddof=1)) if n > 1 else 0.0
+            lo, hi = float(column.min()), float(column.max())
+        else:
+            s = (stats or CCPP_REFERENCE_STATS)[feature]
+            mean, std, lo, hi = s['mean'], s['std'], s['min'], s['max']
+
+        edges = _bin_edges(lo, hi, n_bins)
+
+        if data is not None:
+            proportions = [c / n for c in _histogram_counts(column, edges)]
+        else:
+            cdf = [_normal_cdf(e, mean, std) for e in edges]
+            proportions = [cdf[0]]
+            proportions += [cdf[k + 1] - cdf[k] for k in range(n_bins)]
+            proportions.append(1.0 - cdf[-1])
+
+        profile[feature] = {
+            'mean': mean,
+            'std': std,
+            'min': lo,
+            'max': hi,
+            'bin_edges': edges,
+            'bin_proportions': proportions,
+        }
+        if n is not None:
+            profile[feature]['n'] = n
+    return profile
+
+
+def merge_reference_profile(previous, feature_names, data):
+    """Gabungkan reference profile lama dengan data baru (untuk warm start).
+
+    Bin edges lama dipertahankan; data baru di-bin ke edges tersebut lalu
+    digabung dengan bobot jumlah sampel. Mean/std digabung dengan rumus
+    paralel (Chan). Profile tanpa jumlah sampel ``n`` tidak dapat digabung
+    dan dikembalikan apa adanya.
+    """
+    if not previous or any('n' not in previous.get(f, {}) for f in feature_names):
+        return previous
+
+    data = np.asarray(data)
+    merged = {}
+    for i, feature in enumerate(feature_names):
+        old = previous[feature]
+        column = data[:, i]
+        n_old, n_new = old['n'], len(column)
+        n = n_old + n_new
+
+        mean_new = float(column.mean(dtype=np.float64))
+        m2_new = float(column.var(dtype=np.float64)) * n_new
+        m2_old = old['std'] ** 2 * (n_old - 1)
+        delta = mean_new - old['mean']
+        mean = old['mean'] + delta * n_new / n
+        m2 = m2_old + m2_new + delta ** 2 * n_old * n_new / n
+
+        counts_new = _histogram_counts(column, old['bin_edges'])
+        merged[feature] = {
+            'mean': mean,
+            'std': math.sqrt(m2 / (n - 1)) if n > 1 else 0.0,
+            'min': min(old['min'], float(column.min())),
+            'max': max(old['max'], float(column.max())),
+            'bin_edges': old['bin_edges'],
+            'bin_proportions': [(p * n_old + c) / n for p, c in zip(old['bin_proportions'], counts_new)],
+            'n': n,
+        }
+    return merged
+
+
+def _bin_edges(lo, hi, n_bins):
+    """Bin edges rata antara lo dan hi.
+
+    Fitur konstan (hi == lo) dilebarkan sedikit ke dua sisi agar lebar bin
+    tidak nol; nilai konstan tersebut lalu jatuh di bin tengah, baik saat
+    membuat reference maupun saat monitoring.
+    """
+    if hi <= lo:
+        pad = max(abs(lo), 1.0) * 1e-6
+        lo, hi = lo - pad, hi + pad
+    width = (hi - lo) / n_bins
+    return [lo + width * k for k in range(n_bins + 1)]
+
+
+def _bin_geometry(edges):
+    """(lo, width, n_bins) dari bin edges - dipakai bersama oleh reference dan monitor"""
+    n_bins = len(edges) - 1
+    lo = edges[0]
+    return lo, (edges[-1] - lo) / n_bins, n_bins
+
+
+def _histogram_counts(column, edges):
+    """Jumlah per bin dengan overflow: [< edges[0], bin..., > edges[-1]].
+
+    Memakai aturan yang sama persis dengan ``_bin_index`` (versi vektor),
+    sehingga nilai yang sama selalu masuk bin yang sama di reference dan
+    di monitor.
+    """
+    lo, width, n_bins = _bin_geometry(edges)
+    column = np.asarray(column, dtype=np.float64)
+    if width > 0:
+        k = np.floor((column - lo) / width)
+        k = np.where(k >= n_bins, np.where(column <= lo + width * n_bins, n_bins - 1, n_bins), k) + 1
+    else:
+        # Profile lama dengan lebar nol: nilai == lo di bin pertama, di atasnya overflow
+        k = np.where(column > lo, n_bins + 1, 1)
+    k = np.where(column < lo, 0, k).astype(np.int64)
+    return np.bincount(k, minlength=n_bins + 2).tolist()
+
+
+def _bin_index(x, lo, width, n_bins):
+    """Index bin untuk x; 0 = di bawah min, n_bins + 1 = di atas max"""
+    if x < lo:
+        return 0
+    if width <= 0:
+        return 1 if x == lo else n_bins + 1
+    k = int((x - lo) / width)
+    if k >= n_bins:
+        # Nilai tepat di max masih masuk bin terakhir
+        return n_bins if x <= lo + width * n_bins else n_bins + 1
+    return k + 1
+
+
+class P2Quantile:
+    """Estimator kuantil streaming P² (Jain & Chlamtac) - memori dan update O(1)"""
+
+    def __init__(self, p):
+        self.p = p
+        self.n = 0
+        self._initial = []
+        self.q = []
+        self.pos = []
+        self.desired = []
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def update(self, x):
+        self.n += 1
+        if self.n <= 5:
+            self._initial.append(x)
+            if self.n == 5:
+                self.q = sorted(self._initial)
+                self.pos = [1, 2, 3, 4, 5]
+                p = self.p
+                self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+            return
+
+        q, pos = self.q, self.pos
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Sesuaikan tiga marker tengah
+        for i in range(1, 4):
+            d = self.desired[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + d * (q[i + d] - q[i]) / (pos[i + d] - pos[i])
+                q[i] = candidate
+                pos[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.q, self.pos
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        if self.n == 0:
+            return None
+        if self.n < 5:
+            data = sorted(self._initial)
+            return data[min(int(self.p * len(data)), len(data) - 1)]
+        return self.q[2]
+
+
+class FeatureStats:
+    """Statistik running untuk satu fitur: Welford, kuantil P², dan histogram.
+
+    Selain histogram kumulatif, disimpan juga histogram exponentially decayed
+    (bobot input lama meluruh dengan ``half_life``) untuk skor PSI/KS, agar
+    drift baru tetap terlihat walaupun worker sudah lama berjalan.
+    """
+
+    QUANTILES = (0.05, 0.5, 0.95)
+
+    def __init__(self, reference, half_life=DEFAULT_HALF_LIFE):
+        self.reference = reference
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.out_of_range = 0
+        self.quantiles = {p: P2Quantile(p) for p in self.QUANTILES}
+        self.lo, self.width, self.n_bins = _bin_geometry(reference['bin_edges'])
+        self.counts = [0] * (self.n_bins + 2)
+
+        # Decay lazy: bobot input baru terus membesar, bin lama tidak perlu dikalikan -> O(1)
+        self.growth = 0.5 ** (-1.0 / half_life)
+        self.weight = 1.0
+        self.decayed_counts = [0.0] * (self.n_bins + 2)
+        self.decayed_total = 0.0
+
+    def update(self, x):
+        # Welford online mean/variance
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+
+        for estimator in self.quantiles.values():
+            estimator.update(x)
+
+        k = _bin_index(x, self.lo, self.width, self.n_bins)
+        self.counts[k] += 1
+        if k == 0 or k == self.n_bins + 1:
+            self.out_of_range += 1
+
+        self.weight *= self.growth
+        self.decayed_counts[k] += self.weight
+        self.decayed_total += self.weight
+        if self.weight > 1e100:
+            # Normalisasi ulang sebelum overflow
+            self.decayed_counts = [c / self.weight for c in self.decayed_counts]
+            self.decayed_total /= self.weight
+            self.weight = 1.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    @property
+    def effective_samples(self):
+        """Jumlah sampel efektif pada histogram decayed"""
+        return self.decayed_total / self.weight
+
+    def _proportions(self, decayed, pseudo_count=PSEUDO_COUNT):
+        """Proporsi live per bin, dihaluskan dengan pseudo-count.
+
+        Setiap bin mendapat ``pseudo_count`` sampel semu yang dibagi sesuai
+        proporsi reference (prior Dirichlet berpusat di reference). Dengan
+        sampel sedikit, bin kosong tidak lagi meledakkan PSI; dengan sampel
+        banyak, pengaruh prior hilang.
+        """
+        if decayed:
+            n = self.effective_samples
+            counts = [c / self.weight for c in self.decayed_counts]
+        else:
+            n = self.n
+            counts = self.counts
+        expected = self.reference['bin_proportions']
+        prior = pseudo_count * len(expected)
+        return [(c + prior * e) / (n + prior) for c, e in zip(counts, expected)]
+
+    def psi(self, decayed=True, epsilon=1e-4):
+        """Population Stability Index terhadap reference histogram"""
+        total = 0.0
+        for actual, expected in zip(self._proportions(decayed), self.reference['bin_proportions']):
+            if expected <= 0:
+                # Bin yang kosong di reference: prior juga nol, jadi hanya data live yang mengisi
+                expected = epsilon
+                if actual <= 0:
+                    continue
+            total += (actual - expected) * math.log(actual / expected)
+        return total
+
+    def ks(self, decayed=True):
+        """Aproksimasi statistik KS: selisih CDF maksimum pada batas bin"""
+        live_cdf = ref_cdf = 0.0
+        largest = 0.0
+        for actual, expected in zip(self._proportions(decayed, pseudo_count=0), self.reference['bin_proportions']):
+            live_cdf += actual
+            ref_cdf += expected
+            largest = max(largest, abs(live_cdf - ref_cdf))
+        return largest
+
+
+class DriftMonitor:
+    """Monitor drift input dan kualitas data secara streaming.
+
+    Setiap input prediksi meng-update statistik per fitur dalam O(1) tanpa
+    membaca ulang database. Mean/std/kuantil bersifat kumulatif sejak
+    ``window_start`` (proses dimulai atau ``reset()`` terakhir), sedangkan
+    skor PSI/KS memakai histogram decayed dengan ``half_life`` input.
+    """
+
+    def __init__(self, feature_names, reference_profile=None, min_samples=None,
+                 half_life=DEFAULT_HALF_LIFE):
+        self.feature_names = list(feature_names)
+        self._min_samples = min_samples
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self.set_reference_profile(reference_profile or build_reference_profile(self.feature_names))
+
+    def set_reference_profile(self, reference_profile):
+        """Ganti reference profile dan reset semua statistik"""
+        with self._lock:
+            self.reference_profile = reference_profile
+            if self._min_samples is not None:
+                self.min_samples = self._min_samples
+            else:
+                # Default: MIN_SAMPLES_PER_BIN sampel per bin histogram (termasuk overflow)
+                n_bins = max(len(reference_profile[f]['bin_proportions']) for f in self.feature_names)
+                self.min_samples = MIN_SAMPLES_PER_BIN * n_bins
+            self._reset_locked()
+
+    def reset(self):
+        """Reset semua statistik running"""
+        with self._lock:
+            self._reset_locked()
+
+    def _reset_locked(self):
+        self.features = {f: FeatureStats(self.reference_profile[f], self.half_life)
+                         for f in self.feature_names}
+        self.window_start = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.total_inputs = 0
+        self.invalid_inputs = 0
+
+    def update(self, values):
+        """Update statistik dengan satu baris input (urutan sesuai feature_names)"""
+        with self._lock:
+            self.total_inputs += 1
+            if not all(math.isfinite(v) for v in values):
+                # NaN/inf tidak dimasukkan ke statistik, hanya dicatat sebagai masalah kualitas data
+                self.invalid_inputs += 1
+                return
+            for feature, value in zip(self.feature_names, values):
+                self.features[feature].update(value)
+
+    def get_drift_report(self):
+        """Skor drift (PSI/KS) dan ringkasan statistik per fitur"""
+        with self._lock:
+            features = {}
+            worst_psi = 0.0
+            for feature, stats in self.features.items():
+                reference = stats.reference
+                info = {
+                    'count': stats.n,
+                    'out_of_range': stats.out_of_range,
+                    'reference': {
+                        'mean': round(reference['mean'], 4),
+                        'std': round(reference['std'], 4),
+                        'min': round(reference['min'], 4),
+                        'max': round(reference['max'], 4),
+                    },
+                }
+                if stats.n > 0:
+                    info.update({
+                        'mean': round(stats.mean, 4),
+                        'std': round(stats.std, 4),
+                        'min': stats.min,
+                        'max': stats.max,
+                        'quantiles': {f"p{int(p * 100):02d}": round(e.value(), 4)
+                                      for p, e in stats.quantiles.items()},
+                        'mean_shift_z': round((stats.mean - reference['mean']) / reference['std'], 4)
+                                        if reference['std'] else 0.0,
+                        'psi': round(stats.psi(), 4),
+                        'ks': round(stats.ks(), 4),
+                        'psi_cumulative': round(stats.psi(decayed=False), 4),
+                        'ks_cumulative': round(stats.ks(decayed=False), 4),
+                        'effective_samples': round(stats.effective_samples, 1),
+                    })
+                    if stats.n >= self.min_samples:
+                        worst_psi = max(worst_psi, info['psi'])
+                info['status'] = self._status(stats.n, info.get('psi'))
+                features[feature] = info
+
+            valid = self.total_inputs - self.invalid_inputs
+            return {
+                'total_inputs': self.total_inputs,
+                'invalid_inputs': self.invalid_inputs,
+                'status': self._status(valid, worst_psi),
+                'max_psi': round(worst_psi, 4),
+                'min_samples': self.min_samples,
+                'half_life': self.half_life,
+                'window_start': self.window_start,
+                'features': features,
+            }
+
+    def _status(self, n, psi):
+        if n < self.min_samples or psi is None:
+            return 'insufficient_data'
+        if psi >= PSI_SIGNIFICANT:
+            return 'significant_drift'
+        if psi >= PSI_MODERATE:
+            return 'moderate_drift'
+        return 'stable'
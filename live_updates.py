@@ -0,0 +1,86 @@
+import json
+import queue
+import threading
+
+
+class LiveUpdateHub:
+    """Fan-out hub untuk push update dashboard/charts via Server-Sent Events.
+
+    Setiap viewer mendapat queue sendiri. Publisher (route yang menyimpan
+    prediksi) menghitung delta sekali, lalu hub menyebarkannya ke semua
+    subscriber milik user tersebut - jadi N viewer tidak berarti N kali
+    polling ke database.
+    """
+
+    def __init__(self, queue_size=100, heartbeat_interval=15):
+        self.queue_size = queue_size
+        self.heartbeat_interval = heartbeat_interval
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self.dropped_events = 0
+
+    def subscribe(self, user_id):
+        """Daftarkan viewer baru dan kembalikan queue miliknya"""
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(q)
+        return q
+
+    def unsubscribe(self, user_id, q):
+        """Hapus viewer (dipanggil saat koneksi SSE ditutup)"""
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is None:
+                return
+            subscribers.discard(q)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id):
+        """Cek apakah ada viewer aktif untuk user"""
+        with self._lock:
+            return bool(self._subscribers.get(user_id))
+
+    def subscriber_count(self, user_id=None):
+        """Jumlah viewer aktif (per user atau total)"""
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, user_id, event, data):
+        """Kirim event ke semua viewer user; return jumlah viewer yang menerima"""
+        message = self.format_event(event, data)
+
+        # Snapshot daftar subscriber agar lock tidak ditahan selama put()
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+
+        delivered = 0
+        for q in targets:
+            try:
+                q.put_nowait(message)
+                delivered += 1
+            except queue.Full:
+                # Viewer terlalu lambat - buang event daripada memblokir publisher
+                self.dropped_events += 1
+        return delivered
+
+    def stream(self, user_id):
+        """Generator SSE untuk satu koneksi viewer"""
+        q = self.subscribe(user_id)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    yield q.get(timeout=self.heartbeat_interval)
+                except queue.Empty:
+                    # Komentar SSE menjaga koneksi tetap hidup melewati proxy
+                    yield ': heartbeat\n\n'
+        finally:
+            self.unsubscribe(user_id, q)
+
+    @staticmethod
+    def format_event(event, data):
+        """Format payload sebagai frame Server-Sent Events"""
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,215 @@
+"""Load test untuk endpoint SSE /api/stream.
+
+Menjalankan app di server lokal (threaded) dengan database sementara,
+membuka ratusan koneksi SSE untuk user yang sama, lalu mengirim prediksi
+lewat HTTP (POST /api/predict dengan save_to_db) dan mengukur:
+- apakah setiap viewer menerima setiap event
+- latency request prediksi -> diterima viewer
+- jumlah koneksi database per event (harus konstan, tidak tergantung jumlah viewer)
+
+Jika --model tidak diberikan, model Random Forest kecil dilatih dari data
+sintetis di direktori sementara supaya /api/predict dapat dijalankan.
+
+Contoh:
+    python load_test_sse.py --subscribers 300 --events 20
+    python load_test_sse.py --model random_forest_model.pkl
+"""
+import argparse
+import http.client
+import importlib
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+from werkzeug.serving import make_server
+
+
+def login(port, username, password):
+    """Login via HTTP dan kembalikan session cookie"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    body = urllib.parse.urlencode({'username': username, 'password': password})
+    conn.request('POST', '/login', body=body,
+                 headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie')
+    conn.close()
+    if not cookie:
+        raise RuntimeError('Login gagal - tidak ada session cookie')
+    return cookie.split(';', 1)[0]
+
+
+def post_prediction(port, cookie, temperature):
+    """Kirim prediksi lewat /api/predict dan simpan ke database"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    body = json.dumps({
+        'temperature': temperature,
+        'ambient_pressure': 1013.0,
+        'relative_humidity': 70.0,
+        'exhaust_vacuum': 50.0,
+        'save_to_db': True
+    })
+    conn.request('POST', '/api/predict', body=body,
+                 headers={'Content-Type': 'application/json', 'Cookie': cookie})
+    response = conn.getresponse()
+    result = json.loads(response.read())
+    conn.close()
+    if not result.get('success'):
+        raise RuntimeError(f"Prediksi gagal: {result.get('error')}")
+
+
+def subscriber(port, cookie, expected_events, send_times, latencies, received, ready, lock):
+    """Satu viewer SSE: baca event sampai expected_events diterima"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    conn.request('GET', '/api/stream', headers={'Cookie': cookie, 'Accept': 'text/event-stream'})
+    response = conn.getresponse()
+    ready.release()
+
+    count = 0
+    event_name = None
+    try:
+        while count < expected_events:
+            line = response.fp.readline()
+            if not line:
+                break
+            line = line.decode('utf-8').rstrip('\n')
+            if line.startswith('event: '):
+                event_name = line[len('event: '):]
+            elif line.startswith('data: ') and event_name == 'prediction':
+                arrived = time.perf_counter()
+                payload = json.loads(line[len('data: '):])
+                sent = send_times.get(round(payload['prediction']['temperature'], 4))
+                with lock:
+                    if sent is not None:
+                        latencies.append(arrived - sent)
+                    received[0] += 1
+                count += 1
+                event_name = None
+    finally:
+        conn.close()
+
+
+def build_test_model(path):
+    """Latih Random Forest kecil dari data sintetis CCPP untuk keperluan load test"""
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.normal(19.65, 7.45, 2000),
+        rng.normal(1013.26, 5.94, 2000),
+        rng.normal(73.31, 14.60, 2000),
+        rng.normal(54.31, 12.71, 2000),
+    ])
+    y = 454.6 - 1.98 * X[:, 0] + 0.06 * X[:, 1] - 0.16 * X[:, 2] - 0.23 * X[:, 3]
+    joblib.dump(RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(X, y), path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test SSE live updates')
+    parser.add_argument('--subscribers', type=int, default=300)
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.05, help='Jeda antar prediksi (detik)')
+    parser.add_argument('--model', default=None, help='Path model (default: model sintetis sementara)')
+    args = parser.parse_args()
+
+    model_path = os.path.abspath(args.model) if args.model else None
+
+    # app.py membuat powerplant.db relatif terhadap working directory saat diimpor,
+    # jadi pindah ke direktori sementara sebelum import
+    tmp_dir = tempfile.mkdtemp()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tmp_dir)
+    app_module = importlib.import_module('app')
+    from ml_model import PowerPlantPredictor
+
+    if model_path is None:
+        model_path = os.path.join(tmp_dir, 'loadtest_model.pkl')
+        build_test_model(model_path)
+    app_module.predictor = PowerPlantPredictor(model_path)
+    if not app_module.predictor.is_loaded:
+        print(f"❌ Model tidak dapat dimuat: {model_path}")
+        return 1
+    app_module.live_hub.heartbeat_interval = 1
+
+    # Hitung setiap koneksi database, apa pun method yang memakainya
+    db = app_module.db
+    connection_count = [0]
+    connection_lock = threading.Lock()
+    original_get_connection = db.get_connection
+
+    def counted_get_connection():
+        with connection_lock:
+            connection_count[0] += 1
+        return original_get_connection()
+    db.get_connection = counted_get_connection
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    cookie = login(port, 'admin', 'admin123')
+    user_id = db.verify_user('admin', 'admin123')
+
+    send_times = {}
+    latencies = []
+    received = [0]
+    lock = threading.Lock()
+    ready = threading.Semaphore(0)
+
+    print(f"🔌 Membuka {args.subscribers} koneksi SSE...")
+    start = time.perf_counter()
+    threads = []
+    for _ in range(args.subscribers):
+        t = threading.Thread(target=subscriber, daemon=True,
+                             args=(port, cookie, args.events, send_times, latencies, received, ready, lock))
+        t.start()
+        threads.append(t)
+    for _ in range(args.subscribers):
+        ready.acquire()
+
+    # Tunggu semua generator terdaftar di hub
+    while app_module.live_hub.subscriber_count(user_id) < args.subscribers:
+        time.sleep(0.01)
+    print(f"✅ {args.subscribers} subscriber aktif dalam {time.perf_counter() - start:.2f}s")
+
+    connection_count[0] = 0
+    for i in range(args.events):
+        # Temperature unik per event dipakai untuk mencocokkan event di sisi viewer
+        temperature = round(10.0 + i * 0.01, 4)
+        send_times[temperature] = time.perf_counter()
+        post_prediction(port, cookie, temperature)
+        time.sleep(args.interval)
+
+    for t in threads:
+        t.join(timeout=30)
+    connections = connection_count[0]
+
+    expected = args.subscribers * args.events
+    print("\n" + "=" * 60)
+    print(f"📨 Event diterima     : {received[0]} / {expected}")
+    print(f"🗄️  Koneksi DB         : {connections} ({connections / args.events:.1f} per event, "
+          f"termasuk insert; untuk {args.subscribers} viewer)")
+    print(f"🚮 Event dibuang       : {app_module.live_hub.dropped_events}")
+    if latencies:
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"⏱️  Latency p50/p95/max: {statistics.median(latencies) * 1000:.1f} / "
+              f"{p95 * 1000:.1f} / {latencies[-1] * 1000:.1f} ms")
+    print(f"📁 Database sementara : {os.path.join(tmp_dir, db.db_name)}")
+    print("=" * 60)
+
+    server.shutdown()
+    return 0 if received[0] == expected else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,10 +1,33 @@
+import hashlib
+import json
+import math
 import pickle
 import numpy as np
 import os
+from drift_monitor import DriftMonitor
 try:
     import joblib
 except ImportError:
     joblib = None
+try:
+    import sklearn
+except ImportError:
+    sklearn = None
+
+# Versi format metadata artifact yang didukung
+ARTIFACT_FORMAT_VERSION = 1
+
+def metadata_path_for(model_path):
+    """Path file metadata (.meta.json) untuk sebuah artifact model"""
+    return model_path + '.meta.json'
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hitung SHA-256 file secara bertahap"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 class PowerPlantPredictor:
     def __init__(self, model_path='random_forest_model.pkl'):
@@ -16,8 +39,10 @@ class PowerPlantPredictor:
             self.model_path = model_path
             
         self.model = None
+        self.metadata = None
         self.is_loaded = False
         self.feature_names = ['Temperature', 'Ambient Pressure', 'Relative Humidity', 'Exhaust Vacuum']
+        self.drift_monitor = DriftMonitor(self.feature_names)
         
         # Load model saat inisialisasi
         self.load_model()
@@ -37,11 +62,27 @@ class PowerPlantPredictor:
                 print("💡 Pastikan file 'random_forest_model.pkl' ada di folder yang sama dengan app.py")
                 return False
             
+            # Validasi metadata artifact sebelum unpickle
+            if not self.validate_artifact():
+                return False
+            
             # Gunakan joblib langsung untuk kompatibilitas yang lebih baik dengan scikit-learn
             model_loaded = False
             
+            # Artifact hasil compact_forest.py: array node datar, tanpa pickle
+            if self.model_path.endswith('.npz'):
+                from compact_forest import CompactForest
+                try:
+                    print("🔄 Loading compact forest...")
+                    self.model = CompactForest.load(self.model_path)
+                    print(f"✅ Compact forest berhasil dimuat dari: {self.model_path}")
+                    model_loaded = True
+                except Exception as compact_error:
+                    print(f"❌ Compact forest gagal dimuat: {compact_error}")
+                    return False
+            
             # Coba joblib terlebih dahulu (lebih baik untuk scikit-learn models)
-            if joblib is not None:
+            if not model_loaded and joblib is not None:
                 try:
                     print("🔄 Loading model dengan joblib...")
                     self.model = joblib.load(self.model_path)
@@ -73,6 +114,10 @@ class PowerPlantPredictor:
                 
                 print("✅ Model tidak menggunakan scaling - input langsung diproses")
                 
+                # Pakai distribusi data training sebagai reference drift monitor
+                if self.metadata and self.metadata.get('reference_profile'):
+                    self.drift_monitor.set_reference_profile(self.metadata['reference_profile'])
+                
                 self.is_loaded = True
                 return True
             
@@ -86,6 +131,43 @@ class PowerPlantPredictor:
     
 
     
+    def validate_artifact(self):
+        """Validasi model terhadap file metadata (hash, urutan fitur, versi scikit-learn)"""
+        meta_path = metadata_path_for(self.model_path)
+        if not os.path.exists(meta_path):
+            print("ℹ️ Metadata artifact tidak ditemukan - model dimuat tanpa validasi")
+            return True
+        
+        try:
+            with open(meta_path, 'r') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Metadata artifact tidak dapat dibaca: {e}")
+            return False
+        
+        if metadata.get('format_version', 0) > ARTIFACT_FORMAT_VERSION:
+            print(f"❌ Format artifact v{metadata.get('format_version')} tidak didukung")
+            return False
+        
+        actual_hash = file_sha256(self.model_path)
+        if metadata.get('sha256') != actual_hash:
+            print(f"❌ Hash model tidak cocok dengan metadata: {actual_hash}")
+            print("💡 File model berubah setelah training - latih ulang atau perbarui metadata")
+            return False
+        
+        if metadata.get('feature_names') != self.feature_names:
+            print(f"❌ Urutan fitur model tidak cocok: {metadata.get('feature_names')}")
+            return False
+        
+        trained_version = metadata.get('sklearn_version')
+        if sklearn is not None and trained_version and trained_version != sklearn.__version__:
+            print(f"⚠️ Model dilatih dengan scikit-learn {trained_version}, "
+                  f"terpasang {sklearn.__version__}")
+        
+        print(f"✅ Artifact valid: versi {metadata.get('model_version')}, sha256 {actual_hash[:12]}")
+        self.metadata = metadata
+        return True
+    
     def predict(self, temperature, ambient_pressure, relative_humidity, exhaust_vacuum):
         """Melakukan prediksi power output"""
         if not self.is_loaded or self.model is None:
@@ -100,6 +182,12 @@ class PowerPlantPredictor:
         except (ValueError, TypeError):
             raise ValueError("Input harus berupa angka yang valid.")
         
+        # Update statistik drift (O(1), tanpa query database)
+        # Input NaN/inf tetap dicatat monitor sebagai invalid_inputs sebelum ditolak
+        self.drift_monitor.update([temperature, ambient_pressure, relative_humidity, exhaust_vacuum])
+        if not all(math.isfinite(v) for v in (temperature, ambient_pressure, relative_humidity, exhaust_vacuum)):
+            raise ValueError("Input harus berupa angka yang valid (bukan NaN/inf).")
+        
         # Siapkan data input (tanpa scaling)
         input_data = np.array([[temperature, ambient_pressure, relative_humidity, exhaust_vacuum]])
         print(f"📥 Input: T={temperature}°C, AP={ambient_pressure}mbar, RH={relative_humidity}%, V={exhaust_vacuum}cm Hg")
@@ -156,8 +244,30 @@ class PowerPlantPredictor:
         if hasattr(self.model, 'feature_importances_'):
             info['feature_importance'] = dict(zip(self.feature_names, self.model.feature_importances_))
         
+        if self.metadata:
+            info['model_version'] = self.metadata.get('model_version')
+            info['trained_at'] = self.metadata.get('trained_at')
+            info['metrics'] = self.metadata.get('metrics')
+        
+        drift = self.drift_monitor.get_drift_report()
+        info['drift'] = {
+            'status': drift['status'],
+            'max_psi': drift['max_psi'],
+            'total_inputs': drift['total_inputs'],
+            'invalid_inputs': drift['invalid_inputs']
+        }
+        
         return info
     
+    def get_drift_report(self):
+        """Mendapatkan laporan drift input terhadap distribusi training"""
+        return self.drift_monitor.get_drift_report()
+    
+    def reset_drift_monitor(self):
+        """Mulai window statistik drift baru"""
+        self.drift_monitor.reset()
+        return self.drift_monitor.window_start
+    
     def batch_predict(self, data_list):
         """Prediksi batch untuk multiple input"""
         results = []
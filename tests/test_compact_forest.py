@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('sklearn')
+from sklearn.ensemble import RandomForestRegressor
+
+from compact_forest import CompactForest
+
+
+@pytest.fixture(scope='module')
+def forest():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.normal(19.65, 7.45, 1000),
+        rng.normal(1013.26, 5.94, 1000),
+        rng.normal(73.31, 14.60, 1000),
+        rng.normal(54.31, 12.71, 1000),
+    ])
+    y = 454.6 - 1.98 * X[:, 0] + 0.06 * X[:, 1] - 0.16 * X[:, 2] - 0.23 * X[:, 3]
+    model = RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(X, y)
+    return model, CompactForest.from_sklearn(model), X
+
+
+def test_matches_sklearn_on_finite_rows(forest):
+    model, compact, X = forest
+    np.testing.assert_allclose(compact.predict(X), model.predict(X), rtol=1e-5)
+
+
+def test_save_load_roundtrip(forest, tmp_path):
+    model, compact, X = forest
+    path = str(tmp_path / 'compact.npz')
+    compact.save(path)
+    np.testing.assert_allclose(CompactForest.load(path).predict(X), model.predict(X), rtol=1e-5)
+
+
+@pytest.mark.parametrize('bad', [np.inf, -np.inf, 1e40])
+def test_non_finite_rejected_like_sklearn(forest, bad):
+    model, compact, X = forest
+    row = X[:1].copy()
+    row[0, 0] = bad
+    with pytest.raises(ValueError):
+        model.predict(row)
+    with pytest.raises(ValueError):
+        compact.predict(row)
+
+
+def test_nan_rejected(forest):
+    _, compact, X = forest
+    row = X[:1].copy()
+    row[0, 2] = np.nan
+    with pytest.raises(ValueError):
+        compact.predict(row)
@@ -0,0 +1,95 @@
+import numpy as np
+
+from drift_monitor import (DriftMonitor, _bin_index, _bin_geometry, _histogram_counts,
+                           build_reference_profile, merge_reference_profile)
+
+FEATURES = ['temperature', 'ambient_pressure', 'relative_humidity', 'exhaust_vacuum']
+
+
+def make_reference(rng, n=8000):
+    return build_reference_profile(FEATURES, rng.normal(0.0, 1.0, (n, len(FEATURES))))
+
+
+def feed(monitor, rows):
+    for row in rows:
+        monitor.update(row.tolist())
+
+
+def test_default_min_samples_follows_bin_count():
+    monitor = DriftMonitor(FEATURES, make_reference(np.random.default_rng(0)))
+    # 10 bin + 2 bin overflow
+    assert monitor.min_samples >= 10 * 12
+
+
+def test_no_drift_stays_stable():
+    rng = np.random.default_rng(1)
+    monitor = DriftMonitor(FEATURES, make_reference(rng))
+    statuses = []
+    for _ in range(50):
+        monitor.reset()
+        feed(monitor, rng.normal(0.0, 1.0, (monitor.min_samples, len(FEATURES))))
+        statuses.append(monitor.get_drift_report()['status'])
+
+    assert 'significant_drift' not in statuses
+    assert statuses.count('stable') >= 45
+
+
+def test_insufficient_data_below_min_samples():
+    rng = np.random.default_rng(2)
+    monitor = DriftMonitor(FEATURES, make_reference(rng))
+    feed(monitor, rng.normal(5.0, 1.0, (monitor.min_samples - 1, len(FEATURES))))
+    assert monitor.get_drift_report()['status'] == 'insufficient_data'
+
+
+def test_shift_is_detected():
+    rng = np.random.default_rng(3)
+    monitor = DriftMonitor(FEATURES, make_reference(rng))
+    rows = rng.normal(0.0, 1.0, (monitor.min_samples, len(FEATURES)))
+    rows[:, 0] += 1.0
+    feed(monitor, rows)
+
+    report = monitor.get_drift_report()
+    assert report['status'] == 'significant_drift'
+    assert report['features']['temperature']['status'] == 'significant_drift'
+    assert report['features']['ambient_pressure']['status'] == 'stable'
+
+
+def test_constant_feature_uses_same_bin_as_reference():
+    rng = np.random.default_rng(4)
+    data = rng.normal(0.0, 1.0, (500, len(FEATURES))).astype(np.float32)
+    data[:, 1] = 1013.0
+    reference = build_reference_profile(FEATURES, data)
+    pressure = reference['ambient_pressure']
+    assert pressure['bin_edges'][-1] > pressure['bin_edges'][0]
+
+    monitor = DriftMonitor(FEATURES, reference)
+    for row in data:
+        monitor.update([float(v) for v in row])
+
+    info = monitor.get_drift_report()['features']['ambient_pressure']
+    assert info['psi'] < 0.01
+    assert info['status'] == 'stable'
+
+
+def test_histogram_counts_match_bin_index():
+    rng = np.random.default_rng(5)
+    column = rng.normal(0.0, 1.0, 2000)
+    reference = build_reference_profile(['x'], column[:1000, None])
+    edges = reference['x']['bin_edges']
+    lo, width, n_bins = _bin_geometry(edges)
+
+    # Termasuk nilai tepat di setiap edge dan di luar range
+    values = np.concatenate([column[1000:], edges, [edges[0] - 1.0, edges[-1] + 1.0]])
+    expected = [0] * (n_bins + 2)
+    for x in values:
+        expected[_bin_index(float(x), lo, width, n_bins)] += 1
+    assert _histogram_counts(values, edges) == expected
+
+
+def test_merge_reference_profile_keeps_constant_feature_edges():
+    data = np.full((100, 1), 7.0)
+    reference = build_reference_profile(['x'], data)
+    merged = merge_reference_profile(reference, ['x'], data)
+    assert merged['x']['bin_edges'] == reference['x']['bin_edges']
+    assert merged['x']['bin_proportions'] == reference['x']['bin_proportions']
+    assert merged['x']['n'] == 200
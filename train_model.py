@@ -0,0 +1,320 @@
+"""Training pipeline untuk model Random Forest CCPP.
+
+Membaca dataset CCPP (CSV) atau riwayat tabel ``predictions`` secara
+bertahap (chunk), melatih RandomForestRegressor secara paralel dengan
+matriks fitur float32, lalu menulis artifact model beserta metadata
+(``<model>.meta.json``: urutan fitur, metrik, hash, versi) yang divalidasi
+oleh PowerPlantPredictor saat load.
+
+Contoh:
+    python train_model.py --csv CCPP.csv
+    python train_model.py --from-db powerplant.db --output random_forest_model.pkl
+    python train_model.py --csv data_baru.csv --warm-start --add-trees 20
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from drift_monitor import build_reference_profile, merge_reference_profile
+from ml_model import ARTIFACT_FORMAT_VERSION, PowerPlantPredictor, file_sha256, metadata_path_for
+try:
+    import joblib
+except ImportError:
+    joblib = None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+FEATURE_NAMES = ['Temperature', 'Ambient Pressure', 'Relative Humidity', 'Exhaust Vacuum']
+
+# Nama kolom yang dikenali: dataset CCPP asli (AT, AP, RH, V, PE) dan export tabel predictions
+COLUMN_ALIASES = {
+    'at': 0, 'temperature': 0,
+    'ap': 1, 'ambient_pressure': 1, 'pressure': 1,
+    'rh': 2, 'relative_humidity': 2, 'humidity': 2,
+    'v': 3, 'exhaust_vacuum': 3, 'vacuum': 3,
+    'pe': 'target', 'predicted_power': 'target', 'power': 'target',
+}
+
+
+def read_csv_chunks(path, chunk_size):
+    """Baca CSV per chunk; hasilkan (X float32, y float64) sesuai urutan FEATURE_NAMES"""
+    with open(path, 'r', newline='') as f:
+        sample = f.readline()
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        header = next(csv.reader([sample], dialect))
+
+        columns = {}
+        for i, name in enumerate(header):
+            key = COLUMN_ALIASES.get(name.strip().lower())
+            if key is not None:
+                columns[key] = i
+        missing = [FEATURE_NAMES[k] for k in range(4) if k not in columns]
+        if missing or 'target' not in columns:
+            raise ValueError(f"Kolom CSV tidak lengkap: {header} (kurang: {missing or ['PE']})")
+        order = [columns[k] for k in range(4)]
+        target = columns['target']
+
+        reader = csv.reader(f, dialect)
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader) if row]
+            if not rows:
+                break
+            X = np.array([[row[i] for i in order] for row in rows], dtype=np.float32)
+            y = np.array([row[target] for row in rows], dtype=np.float64)
+            yield X, y
+
+
+def read_db_chunks(db_path, chunk_size):
+    """Baca riwayat tabel predictions per chunk tanpa memuat semua baris sekaligus"""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT temperature, ambient_pressure, relative_humidity,
+                   exhaust_vacuum, predicted_power
+            FROM predictions
+            ORDER BY id
+        ''')
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            data = np.array(rows, dtype=np.float64)
+            yield data[:, :4].astype(np.float32), data[:, 4]
+    finally:
+        conn.close()
+
+
+def load_dataset(chunks):
+    """Gabungkan chunk menjadi satu matriks float32"""
+    X_parts, y_parts = [], []
+    for X, y in chunks:
+        X_parts.append(X)
+        y_parts.append(y)
+    if not X_parts:
+        raise ValueError("Dataset kosong")
+    return np.concatenate(X_parts), np.concatenate(y_parts)
+
+
+def dataset_sha256(X, y):
+    """Hash isi dataset, untuk mengenali data training yang sama di tool lain"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=np.float32).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def holdout_split(n_samples, test_size, random_state):
+    """Index (test, train) yang deterministik dari seed - dipakai ulang oleh compact_forest.py"""
+    indices = np.random.default_rng(random_state).permutation(n_samples)
+    n_test = int(n_samples * test_size)
+    return indices[:n_test], indices[n_test:]
+
+
+def load_existing_model(path):
+    """Load model lama untuk warm start (divalidasi lewat PowerPlantPredictor)"""
+    predictor = PowerPlantPredictor(path)
+    if not predictor.is_loaded:
+        raise ValueError(f"Model untuk warm start tidak dapat dimuat: {path}")
+    if not isinstance(predictor.model, RandomForestRegressor):
+        raise ValueError(f"Warm start hanya untuk RandomForestRegressor, bukan {type(predictor.model).__name__}")
+    return predictor.model, predictor.metadata or {}
+
+
+def dump_model(model, path):
+    """Serialisasi model ke path (joblib jika tersedia, fallback pickle)"""
+    if joblib is not None:
+        joblib.dump(model, path)
+    else:
+        with open(path, 'wb') as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def publish_artifact(model_tmp_path, metadata, path):
+    """Tulis metadata ke file sementara, lalu ganti model dan metadata berurutan.
+
+    Kedua file sudah lengkap sebelum rename, sehingga jeda di mana hash
+    metadata lama tidak cocok dengan model baru hanya selebar dua os.replace.
+    """
+    meta_path = metadata_path_for(path)
+    meta_tmp_path = meta_path + '.tmp'
+    with open(meta_tmp_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(model_tmp_path, path)
+    os.replace(meta_tmp_path, meta_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latih model Random Forest CCPP')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help='Path dataset CCPP (CSV dengan kolom AT, AP, RH, V, PE)')
+    source.add_argument('--from-db', help='Path database SQLite, latih dari tabel predictions')
+    parser.add_argument('--output', default='random_forest_model.pkl')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--min-samples-leaf', type=int, default=1)
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Jumlah core (-1 = semua)')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--warm-start', action='store_true',
+                        help='Tambah tree baru ke model di --output menggunakan data baru')
+    parser.add_argument('--add-trees', type=int, default=20)
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    if args.csv:
+        source_name = os.path.basename(args.csv)
+        X, y = load_dataset(read_csv_chunks(args.csv, args.chunk_size))
+    else:
+        source_name = f"predictions@{os.path.basename(args.from_db)}"
+        X, y = load_dataset(read_db_chunks(args.from_db, args.chunk_size))
+    load_time = time.perf_counter() - start
+    print(f"📥 {len(X)} baris dimuat dari {source_name} dalam {load_time:.2f}s "
+          f"({X.nbytes / 1024 / 1024:.2f} MB float32)")
+
+    test_idx, train_idx = holdout_split(len(X), args.test_size, args.random_state)
+    n_test = len(test_idx)
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_test, y_test = X[test_idx], y[test_idx]
+
+    previous_version = 0
+    base_version = None
+    previous_meta = {}
+    if args.warm_start:
+        model, previous_meta = load_existing_model(output)
+        base_version = previous_meta.get('model_version')
+        model.set_params(warm_start=True, n_jobs=args.n_jobs,
+                         n_estimators=model.n_estimators + args.add_trees)
+        print(f"🌱 Warm start: {len(model.estimators_)} -> {model.n_estimators} trees")
+    else:
+        model = RandomForestRegressor(
+            n_estimators=args.n_estimators,
+            max_depth=args.max_depth,
+            min_samples_leaf=args.min_samples_leaf,
+            n_jobs=args.n_jobs,
+            random_state=args.random_state,
+        )
+
+    if os.path.exists(metadata_path_for(output)):
+        with open(metadata_path_for(output), 'r') as f:
+            previous_version = json.load(f).get('model_version', 0)
+
+    fit_start = time.perf_counter()
+    model.fit(X_train, y_train)
+    training_time = time.perf_counter() - fit_start
+
+    metrics = {}
+    if n_test > 0:
+        y_pred = model.predict(X_test)
+        metrics = {
+            'rmse': round(float(np.sqrt(mean_squared_error(y_test, y_pred))), 4),
+            'mae': round(float(mean_absolute_error(y_test, y_pred)), 4),
+            'r2': round(float(r2_score(y_test, y_pred)), 4),
+            # Warm start: holdout hanya berasal dari data baru
+            'scope': 'new_data_holdout' if args.warm_start else 'holdout',
+        }
+
+    if args.warm_start:
+        # Profile lama + data baru, supaya range training awal tidak dianggap drift
+        reference_profile = merge_reference_profile(
+            previous_meta.get('reference_profile'), FEATURE_NAMES, X_train)
+        if reference_profile is None:
+            reference_profile = build_reference_profile(FEATURE_NAMES, data=X_train)
+    else:
+        reference_profile = build_reference_profile(FEATURE_NAMES, data=X_train)
+
+    # Model disimpan dengan n_jobs=None (satu thread): prediksi satu baris tidak butuh thread pool
+    model.set_params(n_jobs=None, warm_start=False)
+    model_tmp_path = output + '.tmp'
+    dump_model(model, model_tmp_path)
+
+    metadata = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_version': previous_version + 1,
+        'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sha256': file_sha256(model_tmp_path),
+        'file_size': os.path.getsize(model_tmp_path),
+        'feature_names': FEATURE_NAMES,
+        'target': 'PE',
+        'model_type': type(model).__name__,
+        'sklearn_version': sklearn.__version__,
+        'numpy_version': np.__version__,
+        'params': {
+            'n_estimators': model.n_estimators,
+            'max_depth': model.max_depth,
+            'min_samples_leaf': model.min_samples_leaf,
+            'random_state': model.random_state,
+        },
+        'training': {
+            'source': source_name,
+            'n_samples': int(len(X)),
+            'n_train': int(len(X_train)),
+            'n_test': int(n_test),
+            'warm_start': args.warm_start,
+            'base_model_version': base_version,
+            'load_time_s': round(load_time, 3),
+            'training_time_s': round(training_time, 3),
+        },
+        'metrics': metrics,
+        'base_metrics': previous_meta.get('metrics'),
+        # Cukup untuk merekonstruksi baris holdout tanpa menyimpan index-nya
+        'holdout': {
+            'data_sha256': dataset_sha256(X, y),
+            'n_samples': int(len(X)),
+            'n_test': int(n_test),
+            'test_size': args.test_size,
+            'random_state': args.random_state,
+        },
+        'reference_profile': reference_profile,
+    }
+
+    # Ukur memori setelah semua langkah (termasuk metadata) selesai.
+    # max_rss_mb adalah angka peak memory proses (termasuk buffer native
+    # numpy/sklearn dan thread joblib); tracemalloc hanya melihat heap Python.
+    _, python_heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    max_rss_mb = None
+    if resource is not None:
+        # ru_maxrss dalam KB di Linux
+        max_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    metadata['training']['max_rss_mb'] = max_rss_mb
+    metadata['training']['python_heap_peak_mb'] = round(python_heap_peak / 1024 / 1024, 2)
+
+    publish_artifact(model_tmp_path, metadata, output)
+
+    print("\n" + "=" * 60)
+    print(f"🌳 Model v{metadata['model_version']}: {model.n_estimators} trees -> {output}")
+    print(f"⏱️  Training time      : {training_time:.2f}s (n_jobs={args.n_jobs})")
+    if max_rss_mb is not None:
+        print(f"🧠 Peak memory (RSS)  : {max_rss_mb} MB")
+    print(f"🐍 Python heap peak   : {metadata['training']['python_heap_peak_mb']} MB")
+    if metrics:
+        print(f"📊 RMSE={metrics['rmse']}  MAE={metrics['mae']}  R2={metrics['r2']} ({metrics['scope']})")
+    print(f"🔒 SHA-256            : {metadata['sha256']}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())